@@ -10,12 +10,17 @@ LexPrep – Streamlit prototype
 
 from __future__ import annotations
 
-import json
+import hashlib
 import os
 import re
+import shutil
 import tempfile
 import streamlit as st
+from functools import lru_cache
 from pathlib import Path
+from typing import Any
+
+from jsonio import json_loads, json_pretty
 
 # ── Template location ─────────────────────────────────────────────────────────
 TEMPLATE_DIR = Path(__file__).parent / "default_templates"   # ← update path
@@ -26,13 +31,20 @@ def load_template(name: str) -> Path:
 
 
 # ── Calculating correct time zones─────────────────────────────────────────────────────────
-from datetime import datetime
+from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo          # std-lib ≥3.9
 import re
 
 # Detect the browser/host machine’s zone once
 LOCAL_TZ = datetime.now().astimezone().tzinfo
+_UTC     = ZoneInfo("UTC")
+# Containers usually run in UTC – then stored timestamps need no conversion
+_IS_UTC  = LOCAL_TZ.utcoffset(datetime.now()) == timedelta(0)
+
+# legacy “+00:00Z” / “+00:00+00:00” suffixes (see _to_local)
+_ISO_FIX_RE = re.compile(r'\+00:00(?:Z|\+00:00)$')
 
+@lru_cache(maxsize=4096)                # stored timestamps never change
 def _to_local(iso_ts: str) -> str:
     """
     Convert an ISO-8601 timestamp that the DB stored in UTC
@@ -45,7 +57,7 @@ def _to_local(iso_ts: str) -> str:
         # 1️⃣ Collapse the two bad patterns we introduced earlier
         # “+00:00Z”  → “+00:00”
         # “+00:00+00:00” → “+00:00”
-        iso_ts = re.sub(r'\+00:00(?:Z|\+00:00)$', '+00:00', iso_ts)
+        iso_ts = _ISO_FIX_RE.sub('+00:00', iso_ts)
 
         # 2️⃣ Normalise a plain “Z” suffix to “+00:00”
         if iso_ts.endswith("Z"):
@@ -55,7 +67,11 @@ def _to_local(iso_ts: str) -> str:
 
         # 3️⃣ If the string was naïve, assume UTC
         if dt.tzinfo is None:
-            dt = dt.replace(tzinfo=ZoneInfo("UTC"))
+            if _IS_UTC:
+                return dt.strftime("%Y-%m-%d %H:%M")
+            dt = dt.replace(tzinfo=_UTC)
+        elif _IS_UTC and dt.utcoffset() == timedelta(0):
+            return dt.strftime("%Y-%m-%d %H:%M")
 
         # 4️⃣ Return in local zone, nice format
         return dt.astimezone(LOCAL_TZ).strftime("%Y-%m-%d %H:%M")
@@ -64,53 +80,33 @@ def _to_local(iso_ts: str) -> str:
         return iso_ts
 
 
-# ── Title style ─────────────────────────────────────────────────────────
-st.markdown(
-    """
-    <style>
-    .lex-title {
-        font-family: 'Georgia', serif;
-        font-size: 40px;
-        font-weight: 600;
-        color: #0077C8;
-        margin-bottom: 0.2rem;
-    }
-    .lex-ver {
-        font-size: 0.9rem;
-        color: #666;
-        margin-bottom: 1.5rem;
-    }
-    </style>
-    """,
-    unsafe_allow_html=True
-)
-
-
-
-
 # ── project modules ─────────────────────────────────────────────────────────
 
 # ===== database bootstrap =====
 from db import (
     init_db,
     insert_template,
+    insert_templates_bulk,
     list_templates,
-    get_template,
+    count_templates,
     insert_case,
     list_cases,
-    delete_case,
-    get_conn,
+    count_cases,
+    delete_cases_bulk,
+    next_case_id,
+    archive_template,
 )
 
-init_db()  # ensure tables exist BEFORE anything else
+init_db()  # ensure tables exist BEFORE anything else (no-op after the first run)
 
 # -------------------------------------------------------------------------
 # Built-in template seeder (only on a fresh DB)
 
 import pathlib
 
+@st.cache_resource(show_spinner=False)   # once per server process, not per rerun
 def _load_builtin_templates():
-    if list_templates():          # DB already has templates → skip
+    if count_templates():         # DB already has templates → skip
         return
 
     tpl_dir = pathlib.Path(__file__).parent / "default_templates"
@@ -162,60 +158,244 @@ def _load_builtin_templates():
     ]
     
 
-    for t in builtins:
-        insert_template(
-            name=t["name"],
-            description=t["description"],
-            manifest=t["manifest"],
-            docx_path=str(tpl_dir / t["file"]),
-        )
+    # one transaction for the whole seed instead of a commit per template
+    insert_templates_bulk([
+        {
+            "name":        t["name"],
+            "description": t["description"],
+            "manifest":    t["manifest"],
+            "docx_path":   str(tpl_dir / t["file"]),
+        }
+        for t in builtins
+    ])
 
 _load_builtin_templates()
 # ===== end database bootstrap =====
 
-
-
-
-from renderer import render_docx_rtf
-from utils import extract_placeholders
+# renderer (docxtpl + pypandoc) is imported lazily by the page that needs
+# it, keeping cold starts of the other pages light. utils is stdlib-only.
+from utils import SCAN_VERSION, extract_placeholders
 
 # ── app meta ────────────────────────────────────────────────────────────────
 APP_NAME    = "LexPrep"
 APP_VERSION = "v0.9.0"
 
+st.set_page_config(page_title=APP_NAME, layout="wide")
+
+CASES_PER_PAGE = 25        # rows rendered per page on "Generated Documents"
+
 # ── local paths ─────────────────────────────────────────────────────────────
 TEMPLATES_DIR = Path("data/templates")
 TEMPLATES_DIR.mkdir(parents=True, exist_ok=True)
 
 # ── helper utilities ────────────────────────────────────────────────────────
+_SLUG_RE = re.compile(r"[^A-Za-z0-9]+")
+
+
+@lru_cache(maxsize=2048)
 def _slug(text: str) -> str:
     """Return a safe, lowercase slug suitable for filenames."""
-    return re.sub(r"[^A-Za-z0-9]+", "-", text).strip("-").lower()
+    return _SLUG_RE.sub("-", text).strip("-").lower()
+
 
+_LABEL_TBL = str.maketrans({".": " ", "_": " "})
 
+
+@lru_cache(maxsize=2048)
 def _make_label(raw: str) -> str:
     """Snake-case → Title Case for default manifest labels."""
+    return raw.replace("[]", "").translate(_LABEL_TBL).title()
+
+
+# widget labels are title-cased on every rerun – memoise per label text
+_title = lru_cache(maxsize=2048)(str.title)
+
+
+# ── cached DB reads (Streamlit reruns the whole script per widget event) ────
+# The ttl only guards against writes made outside this session (another
+# app instance, or manual edits to data/app.db).
+@st.cache_data(ttl=60, show_spinner=False)
+def _cached_templates() -> list[dict]:
+    """Active templates as plain dicts (sqlite3.Row can't be pickled).
+    Call ``_cached_templates.clear()`` after any template mutation."""
+    return [dict(r) for r in list_templates()]
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _cached_cases(limit: int, offset: int) -> list[dict]:
+    """One page of case summaries as plain dicts (see ``_cases_changed``)."""
+    return [dict(r) for r in list_cases(limit, offset)]
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _cached_case_count() -> int:
+    return count_cases()
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def _load_manifest(tmpl_id: int, raw: str) -> dict:
+    """Parse a template's manifest once per (id, content) – the raw JSON
+    is part of the cache key, so an edited manifest is never served stale."""
+    return json_loads(raw)
+
+
+@st.cache_data(max_entries=2 * CASES_PER_PAGE, show_spinner=False)
+def _file_bytes(path: str, mtime_ns: int) -> bytes:
+    return Path(path).read_bytes()
+
+
+def _read_bytes(path: str) -> bytes:
+    """File contents for a download button, cached per (path, mtime) so a
+    file rewritten in place – e.g. a re-used document name – is re-read."""
+    return _file_bytes(path, os.stat(path).st_mtime_ns)
+
+
+@lru_cache(maxsize=16)
+def _dir_listing(d: str, mtime_ns: int) -> frozenset[str]:
+    """Normalised paths of the entries in *d*; re-scanned only when the
+    directory's mtime changes (i.e. a file was added or removed)."""
+    with os.scandir(d or ".") as it:
+        return frozenset(os.path.normpath(os.path.join(d, e.name)) for e in it)
+
+
+def _existing_files(paths) -> set[str]:
+    """
+    Normalised paths from *paths* that exist on disk – one ``stat`` per
+    distinct directory (plus an ``os.scandir`` when it changed) instead
+    of one ``stat`` per file.
+    """
+    present: set[str] = set()
+    for d in {os.path.dirname(os.path.normpath(p)) for p in paths if p}:
+        try:
+            present |= _dir_listing(d, os.stat(d or ".").st_mtime_ns)
+        except OSError:
+            continue
+    return present
+
+
+def _cases_changed() -> None:
+    """Drop every cache derived from the cases table / output files."""
+    _cached_cases.clear()
+    _cached_case_count.clear()
+    _file_bytes.clear()
+    _dir_listing.cache_clear()
+
+
+# ── cached placeholder scan (keyed by the upload's SHA-256) ─────────────────
+_COPY_CHUNK = 1 << 20      # streaming buffer for upload copies
+
+
+def _upload_sha256(upload) -> str:
+    """
+    SHA-256 of an UploadedFile, hashed straight from its buffer once per
+    upload (``file_id`` is stable across reruns) – later keystrokes on the
+    page hit the memo instead of re-hashing the whole DOCX.
+    """
+    memo_key = f"__sha256::{upload.file_id}"
+    if memo_key not in st.session_state:
+        with upload.getbuffer() as view:
+            st.session_state[memo_key] = hashlib.sha256(view).hexdigest()
+    return st.session_state[memo_key]
+
+
+# Leading-underscore params are skipped by Streamlit's hasher, so the upload
+# is only hashed once (by us) instead of on every call. Persisted to disk,
+# so it survives restarts; Streamlit's key only covers *this* function's
+# source, hence the explicit scan_version for changes inside utils.
+@st.cache_data(max_entries=256, show_spinner=False, persist="disk")
+def _extract_cached(file_hash: str, scan_version: int, _upload) -> list[str]:
+    """Scan the upload for placeholders straight from its in-memory buffer."""
+    _upload.seek(0)
+    return extract_placeholders(_upload)
+
+
+@lru_cache(maxsize=128)
+def _build_manifest_fields(keys: tuple[str, ...]) -> tuple[dict, ...]:
+    """
+    Build the draft manifest ``fields`` for a set of placeholder keys.
+    The result is shared between callers – treat it as read-only.
+    """
+    simple: list[dict] = []
+    repeats: dict[str, list[str]] = {}
+
+    for k in keys:
+        root, sep, sub = k.partition("[].")
+        if sep:
+            repeats.setdefault(root, []).append(sub)
+        else:
+            simple.append({"key": k, "label": _make_label(k), "type": "text"})
+
     return (
-        raw.replace("[]", "")
-        .replace(".", " ")
-        .replace("_", " ")
-        .title()
+        *simple,
+        *(
+            {
+                "key": root,
+                "type": "repeat",
+                "fields": [
+                    {"key": sub, "label": _make_label(sub), "type": "text"}
+                    for sub in subs
+                ],
+            }
+            for root, subs in repeats.items()
+        ),
     )
 
 
+@lru_cache(maxsize=64)
+def _draft_manifest(keys: tuple[str, ...], title: str) -> str:
+    """Pretty JSON for the editable draft – re-serialised only when the
+    placeholders or the title change, not on every other keystroke."""
+    return json_pretty({"title": title, "fields": _build_manifest_fields(keys)})
+
+
+# field type → widget constructor (one dict lookup per field)
+_RENDERERS = {
+    "text":     st.text_input,
+    "textarea": st.text_area,
+    "number":   st.number_input,
+    "date":     st.date_input,
+    "currency": st.text_input,
+}
+
+
+def _validate_manifest(manifest: Any) -> None:
+    """
+    Check a manifest's shape once, at save time, so a bad one can't reach
+    render_fields(). Raises ValueError naming the first offending field.
+    """
+    if not isinstance(manifest, dict) or not isinstance(manifest.get("fields"), list):
+        raise ValueError('manifest must be an object with a "fields" list')
+
+    stack = [("fields", manifest["fields"])]
+    while stack:
+        where, fields = stack.pop()
+        for i, field in enumerate(fields):
+            at = f"{where}[{i}]"
+            if not isinstance(field, dict) or not isinstance(field.get("key"), str) or not field["key"]:
+                raise ValueError(f'{at}: every field needs a non-empty "key"')
+            ftype = field.get("type")
+            if ftype == "repeat":
+                if not isinstance(field.get("fields"), list):
+                    raise ValueError(f'{at}: a repeat group needs a "fields" list')
+                stack.append((f"{at}.fields", field["fields"]))
+            elif ftype not in _RENDERERS:
+                raise ValueError(f'{at}: unknown type {ftype!r}')
+            if not isinstance(field.get("label", ""), str):
+                raise ValueError(f'{at}: "label" must be a string')
+
+
 def render_fields(schema: list[dict], parent: str = "") -> None:
     """Recursively render widgets from the manifest schema."""
+    renderers = _RENDERERS
     for field in schema:
         key, ftype = field["key"], field["type"]
-        label = field.get("label", key).title()
+        label = _title(field.get("label", key))
         path  = f"{parent}.{key}"
         wkey  = f"w::{path}"
 
-        if ftype in ("text", "textarea"):
-            if ftype == "text":
-                st.text_input(label, key=wkey)
-            else:
-                st.text_area(label, key=wkey)
+        widget = renderers.get(ftype)
+        if widget is not None:
+            widget(label, key=wkey)
 
         elif ftype == "repeat":
             cnt_key = f"{wkey}::__count"
@@ -229,45 +409,71 @@ def render_fields(schema: list[dict], parent: str = "") -> None:
                     render_fields(field["fields"], f"{path}[{i}]")
 
 
-def collect_ctx(schema: list[dict], parent: str) -> dict:
+@lru_cache(maxsize=128)
+def _flatten_schema(
+    schema_json: str, parent: str, counts: tuple[tuple[str, int], ...]
+) -> tuple[tuple[tuple, str | None, int], ...]:
     """
-    Rebuild a context dict from Streamlit session-state, using the same
-    namespaced keys that render_fields() created.
+    Walk the manifest once for a given set of repeat counts and return a
+    flat, ordered list of ``(ctx_path, widget_key, repeat_count)`` entries.
 
-    Each widget key is   w::<parent>.<field_path>
-    where *parent* is the page / template prefix passed in.
+    Leaves carry their widget key; repeat groups carry ``None`` plus the
+    number of rows, and always precede their own children.
     """
-    ctx: dict[str, Any] = {}
+    count_of = dict(counts)
+    flat: list[tuple[tuple, str | None, int]] = []
+
+    # explicit work-stack (no recursion); children are pushed reversed so
+    # pops come out in document order
+    stack = [(f, parent, ()) for f in reversed(json_loads(schema_json)["fields"])]
+    while stack:
+        field, prefix, ctx_path = stack.pop()
+        key  = field["key"]
+        path = f"{prefix}.{key}"
+        wkey = f"w::{path}"
+        if field["type"] == "repeat":
+            cnt = int(count_of.get(f"{wkey}::__count", 1))
+            flat.append((ctx_path + (key,), None, cnt))
+            for i in reversed(range(cnt)):
+                row_prefix, row_path = f"{path}[{i}]", ctx_path + (key, i)
+                stack.extend((sub, row_prefix, row_path) for sub in reversed(field["fields"]))
+        else:
+            flat.append((ctx_path + (key,), wkey, 0))
 
-    for field in schema:
-        key   = field["key"]
-        ftype = field["type"]
+    return tuple(flat)
 
-        path  = f"{parent}.{key}"           # always include the prefix
-        wkey  = f"w::{path}"                # full widget key in session_state
 
-        # simple scalar types
-        if ftype in ("text", "textarea", "number", "date", "currency"):
-            ctx[key] = st.session_state.get(wkey)
+def collect_ctx(schema_json: str, parent: str) -> dict:
+    """
+    Rebuild a context dict from Streamlit session-state, using the same
+    namespaced keys that render_fields() created.
 
-        # repeat group → recurse for each repetition
-        elif ftype == "repeat":
-            cnt = int(st.session_state.get(f"{wkey}::__count", 1))
-            ctx[key] = [
-                collect_ctx(field["fields"], parent=f"{path}[{i}]")
-                for i in range(cnt)
-            ]
+    Each widget key is   w::<parent>.<field_path>
+    where *parent* is the page / template prefix passed in.  The schema
+    walk is cached per (manifest, repeat counts), so this is a single
+    pass over a flat list.
+    """
+    state  = st.session_state
+    prefix = f"w::{parent}."
+    counts = tuple(sorted(
+        (k, int(v)) for k, v in state.items()
+        if k.startswith(prefix) and k.endswith("::__count")
+    ))
 
-        # fallback for any custom / future field types
-        else:
-            ctx[key] = st.session_state.get(wkey)
+    ctx: dict[str, Any] = {}
+    for ctx_path, wkey, cnt in _flatten_schema(schema_json, parent, counts):
+        node = ctx
+        for part in ctx_path[:-1]:
+            node = node[part]
+        node[ctx_path[-1]] = (
+            [{} for _ in range(cnt)] if wkey is None else state.get(wkey)
+        )
 
     return ctx
 
 
-# ── global CSS ──────────────────────────────────────────────────────────────
-st.markdown(
-    """
+# ── global CSS (single <style> block, emitted once per run) ────────────────
+_LEXPREP_CSS = """
     <style>
     /* larger, semi-bold form labels */
     div[data-testid="stTextInput"]  label,
@@ -298,6 +504,7 @@ st.markdown(
 
     /* ───── sidebar app title / version ───── */
     section[data-testid="stSidebar"] .lex-title{
+        font-family: 'Georgia', serif;
         font-size: 1.45rem;
         font-weight: 700;
         color: #6CACE4;
@@ -319,9 +526,14 @@ st.markdown(
     section[data-testid="stSidebar"] .row-widget.stRadio input[type="radio"]:checked+div{
         background:rgb(108,172,228);color:#fff;}
     </style>
-    """,
-    unsafe_allow_html=True,
-)
+    """
+# comments / indentation are for us, not the browser: strip them once here
+_LEXPREP_CSS = re.sub(
+    r"\s+", " ", re.sub(r"/\*.*?\*/", "", _LEXPREP_CSS, flags=re.S)
+).strip()
+# Re-emitted every run on purpose: Streamlit drops any element a rerun
+# doesn't produce, so a "once per session" guard would lose the styling.
+st.markdown(_LEXPREP_CSS, unsafe_allow_html=True)
 
 # ── sidebar navigation ──────────────────────────────────────────────────────
 with st.sidebar:
@@ -351,40 +563,11 @@ if PAGE == "Create Template":
 
     # auto-extract placeholders once a DOCX is uploaded
     default_manifest = ""
-    file_bytes: bytes | None = None
     if tpl_file:
-        file_bytes = tpl_file.read()
-
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".docx") as tmp:
-            tmp.write(file_bytes)
-            tmp_path = Path(tmp.name)
-
-        keys = extract_placeholders(tmp_path)
-
-        simple: list[dict] = []
-        repeats: dict[str, list[str]] = {}
-
-        for k in keys:
-            if "[]." in k:
-                root, sub = k.split("[].", 1)
-                repeats.setdefault(root, []).append(sub)
-            else:
-                simple.append({"key": k, "label": _make_label(k), "type": "text"})
-
-        manifest_fields = simple.copy()
-        for root, subs in repeats.items():
-            manifest_fields.append({
-                "key": root,
-                "type": "repeat",
-                "fields": [
-                    {"key": sub, "label": _make_label(sub), "type": "text"}
-                    for sub in subs
-                ],
-            })
+        file_hash = _upload_sha256(tpl_file)
 
-        default_manifest = json.dumps(
-            {"title": tpl_name or "Untitled", "fields": manifest_fields},
-            indent=2,
+        default_manifest = _draft_manifest(
+            tuple(_extract_cached(file_hash, SCAN_VERSION, tpl_file)), tpl_name or "Untitled"
         )
 
     st.markdown("#### Manifest (auto-generated — edit if needed)")
@@ -400,26 +583,44 @@ if PAGE == "Create Template":
             st.error("Please upload a DOCX file."); st.stop()
 
         try:
-            manifest = json.loads(manifest_text)
-            assert isinstance(manifest.get("fields"), list)
-        except Exception as e:
+            manifest = json_loads(manifest_text)
+            _validate_manifest(manifest)
+        except ValueError as e:             # JSONDecodeError is a ValueError
             st.error(f"Manifest JSON error: {e}"); st.stop()
 
-        clean_name = tpl_name.strip() or f"Template {len(list_templates()) + 1}"
-        dst_path = TEMPLATES_DIR / tpl_file.name
-        dst_path.write_bytes(file_bytes or b"")
+        clean_name = tpl_name.strip() or f"Template {count_templates() + 1}"
+        # content-addressed: same-named uploads can't overwrite each other,
+        # and re-uploading an identical DOCX re-uses the stored copy
+        file_hash = _upload_sha256(tpl_file)
+        dst_path  = TEMPLATES_DIR / f"{file_hash[:16]}.docx"
+        if not dst_path.exists():
+            # write to a temp file and rename, so a failed copy can't leave a
+            # truncated <hash>.docx that every later save would re-use
+            tpl_file.seek(0)
+            with tempfile.NamedTemporaryFile(
+                dir=TEMPLATES_DIR, suffix=".part", delete=False
+            ) as out:
+                try:
+                    shutil.copyfileobj(tpl_file, out, length=_COPY_CHUNK)
+                except BaseException:
+                    out.close()
+                    os.unlink(out.name)
+                    raise
+            os.replace(out.name, dst_path)
 
         insert_template(
             clean_name,
             tpl_desc,
             manifest,
             dst_path.as_posix(),
+            content_hash=file_hash,
         )
+        _cached_templates.clear()
         st.success(f"Template “{clean_name}” saved.")
 
     # list existing templates
     st.markdown("#### Existing Templates")
-    templates = list_templates()
+    templates = _cached_templates()
     if not templates:
         st.info("No templates uploaded yet.")
     else:
@@ -434,16 +635,11 @@ if PAGE == "Create Template":
 
             # ---------- fixed delete handler ----------
             if c[2].button("Delete", key=f"del_{row['id']}"):
-                conn = get_conn()
-                conn.execute(
-                    "UPDATE templates SET is_active = 0 WHERE id = ?",
-                    (row["id"],),
-                )
-                conn.commit()
-                conn.close()
+                archive_template(row["id"])
+                _cached_templates.clear()
 
                 st.success(f"Template “{row['name']}” archived. Existing documents retained.")
-                st.experimental_rerun()
+                st.rerun()
             
     
 
@@ -454,13 +650,14 @@ elif PAGE == "Create Case / Fill Form":
     st.header("Generate a Document From a Template")
     
     # ── Template picker ───────────────────────────────────────────────────────
-    templates = list_templates()
-    tmpl_map  = {t["name"]: t for t in templates}              # quick lookup
-    tmpl_name = st.selectbox("Choose a Template", list(tmpl_map.keys()))
+    templates = _cached_templates()
+    # options are the rows themselves → the selection *is* the row
+    tmpl_row  = st.selectbox(
+        "Choose a Template", templates, format_func=lambda t: t["name"]
+    )
 
-    if tmpl_name:                                              # user picked one
-        tmpl_row = tmpl_map[tmpl_name]
-        manifest = json.loads(tmpl_row["manifest_json"])
+    if tmpl_row:                                               # user picked one
+        manifest = _load_manifest(tmpl_row["id"], tmpl_row["manifest_json"])
 
         # prefix every widget key with page + template ID
         PAGE_PREFIX = f"case_{tmpl_row['id']}"
@@ -479,48 +676,54 @@ elif PAGE == "Create Case / Fill Form":
             gen_docx = col1.form_submit_button("Generate DOCX", type="primary")
             gen_rtf  = col2.form_submit_button("Generate RTF",  type="primary")
 
-            if gen_docx or gen_rtf:
-                # gather inputs using the same prefix
-                ctx = collect_ctx(manifest["fields"], parent=PAGE_PREFIX)
+        # ── Generate (outside the form: the form only batches widget input) ──
+        if gen_docx or gen_rtf:
+            from renderer import render_docx_rtf
 
-                # build a base file-stem
-                next_case_id = len(list_cases()) + 1
-                base_stem = _slug(doc_name) if doc_name else _slug(
-                    f"{tmpl_row['name']}_{next_case_id}"
-                )
+            # gather inputs using the same prefix
+            ctx = collect_ctx(tmpl_row["manifest_json"], parent=PAGE_PREFIX)
 
-                docx_path, rtf_path = render_docx_rtf(
-                    tmpl_row["docx_path"], ctx, base_name=base_stem
-                )
+            # build a base file-stem
+            base_stem = _slug(doc_name) if doc_name else _slug(
+                f"{tmpl_row['name']}_{next_case_id()}"
+            )
 
-                case_id = insert_case(
-                    tmpl_row["id"], ctx, docx_path, rtf_path, doc_name or None
-                )
+            docx_path, rtf_path = render_docx_rtf(
+                tmpl_row["docx_path"], ctx, base_name=base_stem
+            )
+
+            case_id = insert_case(
+                tmpl_row["id"], ctx, docx_path, rtf_path, doc_name or None
+            )
+            _cases_changed()
 
-                st.session_state["last_gen"] = {
-                    "docx_path": docx_path,
-                    "rtf_path":  rtf_path,
-                    "base":      base_stem,
-                    "case_id":   case_id,
-                }
-                st.success(f"Generated! Case #{case_id}")
+            st.session_state["last_gen"] = {
+                "docx_path": docx_path,
+                "rtf_path":  rtf_path,
+                "base":      base_stem,
+                "case_id":   case_id,
+            }
+            st.success(f"Generated! Case #{case_id}")
 
         # ── Download buttons (stay after clicks) ──────────────────────────────
         if "last_gen" in st.session_state:
             g = st.session_state["last_gen"]
             d1, d2 = st.columns(2)
 
-            with open(g["docx_path"], "rb") as fdocx:
+            # bytes come from the shared cache – no file is opened per rerun;
+            # the case may have been deleted on the history page meanwhile
+            present = _existing_files((g["docx_path"], g["rtf_path"]))
+            if os.path.normpath(g["docx_path"]) in present:
                 d1.download_button(
                     "Download DOCX",
-                    fdocx,
+                    _read_bytes(g["docx_path"]),
                     file_name=f"{g['base']}.docx",
                     key=f"dl_docx_{g['case_id']}",
                 )
-            with open(g["rtf_path"], "rb") as frtf:
+            if os.path.normpath(g["rtf_path"]) in present:
                 d2.download_button(
                     "Download RTF",
-                    frtf,
+                    _read_bytes(g["rtf_path"]),
                     file_name=f"{g['base']}.rtf",
                     key=f"dl_rtf_{g['case_id']}",
                 )
@@ -534,46 +737,85 @@ else:  # PAGE == "Generated Documents"
     PAGE_PREFIX = "gen_docs"
     st.header("Previously Generated Documents")
     
-    cases = list_cases()
-    if not cases:
+    total = _cached_case_count()
+    if not total:
         st.info("No documents generated yet."); st.stop()
 
-    h = st.columns([1, 4, 3, 3, 2, 2, 2])   
-    h[0].markdown("**ID**")
-    h[1].markdown("**Document Name**")
-    h[2].markdown("**Template**")
-    h[3].markdown("**Date & Time**")
-    h[4].markdown("**DOCX**")
-    h[5].markdown("**RTF**")
-    h[6].markdown("**Delete**")             
-    
-
-    for c in cases:
-        cols = st.columns([1, 4, 3, 3, 2, 2, 2])   # ← seven columns now
-        cols[0].markdown(str(c["id"]))
-        display_name = c["doc_name"] or f"Case {c['id']}"
-        cols[1].markdown(display_name)
-        cols[2].markdown(c["template_name"])
-        cols[3].markdown(_to_local(c["created_at"]))
-
-        base = _slug(c["doc_name"]) if c["doc_name"] else _slug(f"{c['template_name']}_{c['id']}")
+    # only fetch (and lay out) one page of rows per rerun
+    n_pages = (total - 1) // CASES_PER_PAGE + 1
+    page_no = 1
+    if n_pages > 1:
+        page_key = f"{PAGE_PREFIX}.__page"
+        # session_state owns the value (no value= on the widget), so the
+        # clamp below doesn't trigger Streamlit's default-value warning
+        st.session_state.setdefault(page_key, 1)
+        if st.session_state[page_key] > n_pages:   # rows were deleted
+            st.session_state[page_key] = n_pages
+        page_no = st.number_input(
+            f"Page (of {n_pages})", min_value=1, max_value=n_pages,
+            step=1, key=page_key,
+        )
+    cases = _cached_cases(CASES_PER_PAGE, (int(page_no) - 1) * CASES_PER_PAGE)
 
-        # DOCX download
-        if os.path.exists(c["docx_path"]):
-            with open(c["docx_path"], "rb") as fd:
-                cols[4].download_button("📄", fd, file_name=f"{base}.docx", key=f"docx_{c['id']}")
-        else:
-            cols[4].markdown("—")
+    present = _existing_files(
+        p for c in cases for p in (c["docx_path"], c["rtf_path"])
+    )
 
-        # RTF download
-        if os.path.exists(c["rtf_path"]):
-            with open(c["rtf_path"], "rb") as fr:
-                cols[5].download_button("📝", fr, file_name=f"{base}.rtf", key=f"rtf_{c['id']}")
-        else:
-            cols[5].markdown("—")
+    def _on_disk(p: str | None) -> bool:
+        return bool(p) and os.path.normpath(p) in present
+
+    # per-row display values, computed in one pass before any layout work
+    rows = [
+        (
+            c,
+            c["doc_name"] or f"Case {c['id']}",
+            _slug(c["doc_name"] or f"{c['template_name']}_{c['id']}"),
+            _on_disk(c["docx_path"]),
+            _on_disk(c["rtf_path"]),
+        )
+        for c in cases
+    ]
 
-        # Delete button
-        if cols[6].button("🗑️", key=f"del_{c['id']}"):
-            delete_case(c["id"], c["docx_path"], c["rtf_path"])   # remove row + files
-            st.experimental_rerun()                               # refresh table
+    # One grid element for the whole page instead of seven st.columns
+    # containers per row; the "Select" tick is its only editable cell and
+    # drives the download / delete actions below it.
+    grid = st.data_editor(
+        [
+            {
+                "Select":        False,
+                "ID":            c["id"],
+                "Document Name": display_name,
+                "Template":      c["template_name"],
+                "Date & Time":   _to_local(c["created_at"]),
+                "DOCX":          "✓" if has_docx else "—",
+                "RTF":           "✓" if has_rtf else "—",
+            }
+            for c, display_name, _, has_docx, has_rtf in rows
+        ],
+        key=f"{PAGE_PREFIX}.__grid",
+        hide_index=True,
+        use_container_width=True,
+        disabled=["ID", "Document Name", "Template", "Date & Time", "DOCX", "RTF"],
+        column_config={"Select": st.column_config.CheckboxColumn(width="small")},
+    )
+    selected = [r["ID"] for r in grid if r["Select"]]
+
+    # ── downloads: file bytes are only read for a single selected case ─────
+    if len(selected) == 1:
+        c, _, base, has_docx, has_rtf = next(r for r in rows if r[0]["id"] == selected[0])
+        d1, d2, _ = st.columns([2, 2, 6])
+        if has_docx:
+            d1.download_button("📄 Download DOCX", _read_bytes(c["docx_path"]),
+                               file_name=f"{base}.docx", key=f"docx_{c['id']}")
+        if has_rtf:
+            d2.download_button("📝 Download RTF", _read_bytes(c["rtf_path"]),
+                               file_name=f"{base}.rtf", key=f"rtf_{c['id']}")
+    elif selected:
+        st.caption("Select a single document to download it.")
+
+    # ── delete: one transaction for every ticked row ───────────────────────
+    if st.button(f"Delete Selected ({len(selected)})", disabled=not selected):
+        delete_cases_bulk(selected)
+        _cases_changed()
+        st.rerun()
         
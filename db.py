@@ -8,11 +8,17 @@ SQLite helper layer for LexPrep
 
 from __future__ import annotations
 
-import json
+import logging
+import os
+import queue
 import sqlite3
+import threading
+from contextlib import contextmanager
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, List
+from typing import Any, Iterator, List
+
+from jsonio import json_dumps, json_loads
 
 # ──────────────────────────────
 # Database location
@@ -22,68 +28,239 @@ DB_PATH.parent.mkdir(parents=True, exist_ok=True)
 
 
 # ──────────────────────────────
-# Connection helper
+# Connection helpers
 # ──────────────────────────────
-def get_conn() -> sqlite3.Connection:
-    conn = sqlite3.connect(DB_PATH)
+# SQLite allows one writer but many concurrent readers (WAL). Writes share a
+# single connection behind a lock; reads come from a small pool of read-only
+# connections so list/count queries from other sessions don't queue behind
+# each other or behind an insert. Connections live for the whole process, so
+# SQLite's per-connection statement cache compiles the hot queries only once.
+_CONN: sqlite3.Connection | None = None
+_CONN_LOCK = threading.RLock()
+
+# prepared statements kept per connection (sqlite3 default: 128)
+_STMT_CACHE = 256
+
+_READ_POOL_SIZE = min(4, os.cpu_count() or 1)
+_READ_POOL: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue()
+_READ_OPENED = 0
+_READ_LOCK = threading.Lock()
+_READ_WAIT = 30.0   # seconds to wait for a pooled reader before giving up
+
+
+def _configure(conn: sqlite3.Connection) -> sqlite3.Connection:
     conn.row_factory = sqlite3.Row
+    # WAL (set in init_db) only needs an fsync at checkpoints with this
+    conn.execute("PRAGMA synchronous=NORMAL")
+    # sorts / temp b-trees (ORDER BY created_at) stay off disk
+    conn.execute("PRAGMA temp_store=MEMORY")
+    # ~20 MB page cache (negative = KiB) instead of the 2 MB default
+    conn.execute("PRAGMA cache_size=-20000")
+    # wait for another process's writer (a second app instance, or the
+    # sqlite3 shell) instead of failing straight away with "database is locked"
+    conn.execute("PRAGMA busy_timeout=5000")
     return conn
 
 
+def get_conn() -> sqlite3.Connection:
+    """Return the shared write connection, opening it on first use.
+    Streamlit runs sessions on several threads – go through ``conn_ctx()``."""
+    global _CONN
+    if _CONN is not None:          # fast path: no lock once it's open
+        return _CONN
+    with _CONN_LOCK:
+        if _CONN is None:
+            # IMMEDIATE: take the write lock at BEGIN, so a transaction never
+            # has to upgrade from a read lock (and hit SQLITE_BUSY) later
+            _CONN = _configure(sqlite3.connect(
+                DB_PATH, check_same_thread=False, isolation_level="IMMEDIATE",
+                cached_statements=_STMT_CACHE,
+            ))
+        return _CONN
+
+
+# Planner statistics. PRAGMA optimize (SQLite < 3.46) never analyses a table
+# that has no stats yet, so use a plain ANALYZE – bounded by analysis_limit
+# to a few hundred rows per index, which keeps it cheap on any table size.
+_ANALYZE_EVERY = 1000
+_WRITES = 0
+
+
+def _refresh_stats() -> None:
+    """Best-effort ANALYZE on the write connection, outside any caller's
+    transaction; a failure is logged, never raised."""
+    try:
+        with _CONN_LOCK:
+            conn = get_conn()
+            conn.execute("PRAGMA analysis_limit=400")
+            conn.execute("ANALYZE")
+    except sqlite3.Error as err:
+        logging.warning("Refreshing planner statistics failed: %s", err)
+
+
+@contextmanager
+def conn_ctx() -> Iterator[sqlite3.Connection]:
+    """
+    Exclusive use of the write connection; commits on success and rolls
+    back on error.
+    """
+    global _WRITES
+    conn = get_conn()
+    with _CONN_LOCK, conn:
+        yield conn
+        _WRITES += 1
+        refresh = _WRITES >= _ANALYZE_EVERY
+        if refresh:
+            _WRITES = 0
+    # after the commit, so a failing ANALYZE can't roll back the caller's write
+    if refresh:
+        _refresh_stats()
+
+
+@contextmanager
+def read_ctx() -> Iterator[sqlite3.Connection]:
+    """
+    Borrow a read-only connection from the pool (opened on demand, up to
+    ``_READ_POOL_SIZE``; beyond that, wait for one to be returned).
+    """
+    global _READ_OPENED
+    try:
+        conn = _READ_POOL.get_nowait()
+    except queue.Empty:
+        with _READ_LOCK:
+            grow = _READ_OPENED < _READ_POOL_SIZE
+            if grow:
+                _READ_OPENED += 1
+        if grow:
+            try:
+                conn = _configure(sqlite3.connect(
+                    f"file:{DB_PATH.as_posix()}?mode=ro", uri=True,
+                    check_same_thread=False, cached_statements=_STMT_CACHE,
+                ))
+            except BaseException:
+                # give the slot back, or a failed open shrinks the pool for good
+                with _READ_LOCK:
+                    _READ_OPENED -= 1
+                raise
+        else:
+            try:
+                conn = _READ_POOL.get(timeout=_READ_WAIT)
+            except queue.Empty:
+                raise sqlite3.OperationalError(
+                    f"no read connection free after {_READ_WAIT:g}s"
+                ) from None
+    try:
+        yield conn
+    finally:
+        _READ_POOL.put(conn)
+
+
 # ──────────────────────────────
 # Schema creation + lightweight migrations
 # ──────────────────────────────
+_INITIALIZED = False
+
+
 def init_db() -> None:
     """Create tables if missing, then add any new columns required by
-    newer versions. Safe to call on every start-up."""
-    conn = get_conn()
-    cur = conn.cursor()
-
-    # 1️⃣  Always make sure the core tables exist
-    cur.executescript(
-        """
-        CREATE TABLE IF NOT EXISTS templates (
-            id            INTEGER PRIMARY KEY AUTOINCREMENT,
-            name          TEXT NOT NULL,
-            description   TEXT,
-            manifest_json TEXT NOT NULL,
-            docx_path     TEXT NOT NULL,
-            version       INTEGER NOT NULL DEFAULT 1,
-            created_at    TEXT,               -- UTC ISO string
-            is_active     INTEGER DEFAULT 1   -- soft-delete flag
-        );
-
-        CREATE TABLE IF NOT EXISTS cases (
-            id               INTEGER PRIMARY KEY AUTOINCREMENT,
-            doc_name         TEXT,
-            template_id      INTEGER NOT NULL,
-            input_json       TEXT NOT NULL,
-            docx_path        TEXT,
-            rtf_path         TEXT,
-            created_at       TEXT,            -- UTC ISO string
-            FOREIGN KEY (template_id) REFERENCES templates(id)
-        );
-        """
-    )
-
-    # 2️⃣  Add columns that older DB files might lack
-    # doc_name in cases
-    cur.execute("PRAGMA table_info(cases)")
-    if "doc_name" not in [row[1] for row in cur.fetchall()]:
-        cur.execute("ALTER TABLE cases ADD COLUMN doc_name TEXT")
-
-    # created_at in templates
-    cur.execute("PRAGMA table_info(templates)")
-    if "created_at" not in [row[1] for row in cur.fetchall()]:
-        cur.execute("ALTER TABLE templates ADD COLUMN created_at TEXT")
-
-    # is_active in templates
-    cur.execute("PRAGMA table_info(templates)")
-    if "is_active" not in [row[1] for row in cur.fetchall()]:
-        cur.execute("ALTER TABLE templates ADD COLUMN is_active INTEGER DEFAULT 1")
-
-    conn.commit()
-    conn.close()
+    newer versions. Safe to call on every start-up – after the first
+    successful run in a process it returns immediately."""
+    global _INITIALIZED
+    if _INITIALIZED:
+        return
+
+    with conn_ctx() as conn:
+        cur = conn.cursor()
+
+        # 0️⃣  Write-ahead log: readers don't block the writer, fewer fsyncs.
+        #     Persistent in the DB file, so setting it here is enough.
+        cur.execute("PRAGMA journal_mode=WAL")
+
+        # 1️⃣  Always make sure the core tables exist
+        cur.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS templates (
+                id            INTEGER PRIMARY KEY AUTOINCREMENT,
+                name          TEXT NOT NULL,
+                description   TEXT,
+                manifest_json TEXT NOT NULL,
+                docx_path     TEXT NOT NULL,
+                version       INTEGER NOT NULL DEFAULT 1,
+                created_at    TEXT,               -- UTC ISO string
+                is_active     INTEGER DEFAULT 1,  -- soft-delete flag
+                content_hash  TEXT                -- SHA-256 of the DOCX
+            );
+
+            CREATE TABLE IF NOT EXISTS cases (
+                id               INTEGER PRIMARY KEY AUTOINCREMENT,
+                doc_name         TEXT,
+                template_id      INTEGER NOT NULL,
+                input_json       TEXT NOT NULL,
+                docx_path        TEXT,
+                rtf_path         TEXT,
+                created_at       TEXT,            -- UTC ISO string
+                FOREIGN KEY (template_id) REFERENCES templates(id)
+            );
+            """
+        )
+
+        # 2️⃣  Add columns that older DB files might lack
+        #     (one introspection per table). DDL doesn't open an implicit
+        #     transaction, so take the write lock explicitly: the checks and
+        #     ALTERs then run as one unit (committed by the index script
+        #     below, rolled back by conn_ctx on error) and a second process
+        #     can't add the same column between our check and our ALTER.
+        cur.execute("BEGIN IMMEDIATE")
+        case_cols = {row[1] for row in cur.execute("PRAGMA table_info(cases)")}
+        tmpl_cols = {row[1] for row in cur.execute("PRAGMA table_info(templates)")}
+
+        # doc_name in cases
+        if "doc_name" not in case_cols:
+            cur.execute("ALTER TABLE cases ADD COLUMN doc_name TEXT")
+
+        # created_at in templates
+        if "created_at" not in tmpl_cols:
+            cur.execute("ALTER TABLE templates ADD COLUMN created_at TEXT")
+
+        # is_active in templates
+        if "is_active" not in tmpl_cols:
+            cur.execute("ALTER TABLE templates ADD COLUMN is_active INTEGER DEFAULT 1")
+
+        # content_hash in templates
+        if "content_hash" not in tmpl_cols:
+            cur.execute("ALTER TABLE templates ADD COLUMN content_hash TEXT")
+
+        # 3️⃣  Indexes – after the migrations, since they cover added columns
+        cur.executescript(
+            """
+            -- history page: ORDER BY created_at DESC LIMIT … without a sort
+            CREATE INDEX IF NOT EXISTS idx_cases_created
+                ON cases(created_at DESC);
+
+            -- per-template case lookups (WHERE template_id = ? ORDER BY
+            -- created_at DESC). No app query filters by template yet – the
+            -- history join scans idx_cases_created and probes templates by
+            -- rowid – so for now this only costs writes; it is kept because
+            -- it supersedes the old single-column template_id index.
+            CREATE INDEX IF NOT EXISTS idx_cases_tpl_created
+                ON cases(template_id, created_at DESC);
+            DROP INDEX IF EXISTS idx_cases_template_id;
+
+            -- list_templates(): WHERE is_active = 1 ORDER BY created_at DESC
+            CREATE INDEX IF NOT EXISTS idx_templates_active_created
+                ON templates(is_active, created_at DESC);
+
+            -- nothing calls list_templates(active_only=False); don't pay for
+            -- an index that only it would use
+            DROP INDEX IF EXISTS idx_templates_created;
+            """
+        )
+
+    # 4️⃣  Planner statistics – refreshed on every start (and every
+    #     _ANALYZE_EVERY writes, see conn_ctx) so they track the data
+    _refresh_stats()
+
+    _INITIALIZED = True
 
 
 # Initialise schema immediately when the module is imported
@@ -98,15 +275,15 @@ def get_template(template_id: int):
     """
     Return the row for a single template.
     """
-    conn = get_conn()
-    conn.row_factory = sqlite3.Row          # if you haven't set it globally
-    cur  = conn.execute(
-        "SELECT * FROM templates WHERE id = ?",
-        (template_id,)
-    )
-    row = cur.fetchone()
-    conn.close()
-    return row
+    with read_ctx() as conn:
+        return conn.execute(
+            """
+            SELECT id, name, description, manifest_json, docx_path,
+                   version, created_at, is_active, content_hash
+            FROM templates WHERE id = ?
+            """,
+            (template_id,)
+        ).fetchone()
 
 
 
@@ -116,37 +293,93 @@ def insert_template(
     description: str | None,
     manifest: dict,
     docx_path: str,
+    content_hash: str | None = None,
 ) -> int:
-    conn = get_conn()
-    cur  = conn.cursor()
-
     # ISO-8601 in UTC, e.g. “2025-07-27T06:18:42Z”
     now_utc = datetime.utcnow().replace(tzinfo=timezone.utc)\
                                .isoformat(timespec="seconds") 
 
-    cur.execute(
-        """
-        INSERT INTO templates
-              (name, description, manifest_json, docx_path, created_at)
-        VALUES (?,    ?,          ?,             ?,         ?);
-        """,
-        (name, description, json.dumps(manifest), docx_path, now_utc),
-    )
-    conn.commit()
+    with conn_ctx() as conn:
+        cur = conn.execute(
+            """
+            INSERT INTO templates
+                  (name, description, manifest_json, docx_path, created_at,
+                   content_hash)
+            VALUES (?,    ?,          ?,             ?,         ?,
+                    ?);
+            """,
+            (name, description, json_dumps(manifest), docx_path, now_utc,
+             content_hash),
+        )
     return cur.lastrowid
 
 
 
 
-def list_templates(active_only: bool = True) -> List[sqlite3.Row]:
-    cur = get_conn().cursor()
-    if active_only:
-        cur.execute(
-            "SELECT * FROM templates WHERE is_active = 1 ORDER BY created_at DESC"
+def insert_templates_bulk(rows: list[dict[str, Any]]) -> None:
+    """
+    Insert several templates in one transaction (one commit/fsync).
+    Each row needs ``name``, ``description``, ``manifest`` and ``docx_path``.
+    """
+    now_utc = datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+    with conn_ctx() as conn:
+        conn.executemany(
+            """
+            INSERT INTO templates
+                  (name, description, manifest_json, docx_path, created_at)
+            VALUES (?,    ?,          ?,             ?,         ?);
+            """,
+            [
+                (r["name"], r["description"], json_dumps(r["manifest"]),
+                 r["docx_path"], now_utc)
+                for r in rows
+            ],
+        )
+
+
+# what the UI reads from a template row (picker, form, renderer, list)
+_TEMPLATE_LIST_COLS = "id, name, created_at, manifest_json, docx_path"
+
+# SQL text built once at import rather than per call; the statement cache
+# is keyed by that text, so each variant is prepared once per connection
+_SQL_LIST_TEMPLATES = {
+    True:  f"SELECT {_TEMPLATE_LIST_COLS} FROM templates "
+           "WHERE is_active = 1 ORDER BY created_at DESC LIMIT ? OFFSET ?",
+    False: f"SELECT {_TEMPLATE_LIST_COLS} FROM templates "
+           "ORDER BY created_at DESC LIMIT ? OFFSET ?",
+}
+_SQL_COUNT_TEMPLATES = {
+    True:  "SELECT COUNT(*) FROM templates WHERE is_active = 1",
+    False: "SELECT COUNT(*) FROM templates",
+}
+
+
+def list_templates(
+    active_only: bool = True, limit: int = -1, offset: int = 0
+) -> List[sqlite3.Row]:
+    """
+    Templates, newest first; ``active_only=False`` includes archived ones.
+    ``limit=-1`` means no limit (the template picker needs them all).
+    """
+    with read_ctx() as conn:
+        return conn.execute(
+            _SQL_LIST_TEMPLATES[bool(active_only)], (limit, offset)
+        ).fetchall()
+
+
+def count_templates(active_only: bool = True) -> int:
+    with read_ctx() as conn:
+        return conn.execute(_SQL_COUNT_TEMPLATES[bool(active_only)]).fetchone()[0]
+
+
+def archive_template(template_id: int) -> None:
+    """Soft-delete a template; cases that used it keep their history."""
+    with conn_ctx() as conn:
+        conn.execute(
+            "UPDATE templates SET is_active = 0 WHERE id = ?",
+            (template_id,),
         )
-    else:  # include archived templates
-        cur.execute("SELECT * FROM templates ORDER BY created_at DESC")
-    return cur.fetchall()
 
 
 
@@ -154,6 +387,14 @@ def list_templates(active_only: bool = True) -> List[sqlite3.Row]:
 # Case helpers
 # ──────────────────────────────
 # db.py  – keep everything else the same
+_SQL_INSERT_CASE = """
+    INSERT INTO cases
+      (template_id, input_json, docx_path, rtf_path,
+       doc_name,    created_at)
+    VALUES (?, ?, ?, ?, ?, ?);
+"""
+
+
 def insert_case(
     template_id: int,
     inputs: dict[str, Any],
@@ -161,56 +402,123 @@ def insert_case(
     rtf_path: str | None,
     doc_name: str | None,
 ) -> int:
-    conn = get_conn()
-    cur  = conn.cursor()
-
     now_utc = datetime.now(timezone.utc).isoformat(timespec="seconds")
 
-    cur.execute(
-        """
-        INSERT INTO cases
-          (template_id, input_json, docx_path, rtf_path,
-           doc_name,    created_at)
-        VALUES
-          (?,           ?,          ?,         ?, 
-           ?,           ?);
-        """,
-        (template_id,
-         json.dumps(inputs),
-         docx_path,
-         rtf_path,
-         doc_name,
-         now_utc),          # ← new value goes here
-    )
-    conn.commit()
+    with conn_ctx() as conn:
+        cur = conn.execute(
+            _SQL_INSERT_CASE,
+            (template_id,
+             json_dumps(inputs),               # date widgets → ISO text
+             docx_path,
+             rtf_path,
+             doc_name,
+             now_utc),          # ← new value goes here
+        )
     return cur.lastrowid
 
 
+def insert_cases_bulk(rows: list[dict[str, Any]]) -> list[int]:
+    """
+    Insert several cases in one transaction (one commit/fsync) and return
+    their new ids in order. Each row needs ``template_id``, ``inputs``,
+    ``docx_path``, ``rtf_path`` and ``doc_name``.
+    """
+    now_utc = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    params = [
+        (r["template_id"], json_dumps(r["inputs"]), r["docx_path"],
+         r["rtf_path"], r["doc_name"], now_utc)
+        for r in rows
+    ]
+
+    with conn_ctx() as conn:
+        # executemany can't hand back per-row ids; the commit (the costly
+        # part) still happens once for the whole batch
+        return [conn.execute(_SQL_INSERT_CASE, p).lastrowid for p in params]
 
-def list_cases() -> List[sqlite3.Row]:
-    cur = get_conn().cursor()
-    cur.execute(
-        """
-        SELECT c.*, t.name AS template_name
-        FROM cases c
-        JOIN templates t ON t.id = c.template_id
-        ORDER BY c.created_at DESC;
-        """
-    )
-    return cur.fetchall()
+
+def list_cases(limit: int = -1, offset: int = 0) -> List[sqlite3.Row]:
+    """
+    One page of case rows, newest first; ``limit=-1`` means no limit.
+    ``input_json`` is left out – fetch it per case with ``get_case_inputs()``.
+    """
+    with read_ctx() as conn:
+        return conn.execute(
+            """
+            SELECT c.id, c.template_id, c.doc_name, c.docx_path, c.rtf_path,
+                   c.created_at, t.name AS template_name
+            FROM cases c
+            JOIN templates t ON t.id = c.template_id
+            ORDER BY c.created_at DESC
+            LIMIT ? OFFSET ?;
+            """,
+            (limit, offset),
+        ).fetchall()
+
+
+def get_case_inputs(case_id: int) -> dict[str, Any] | None:
+    """The form values a case was generated from, or None if it's gone."""
+    with read_ctx() as conn:
+        row = conn.execute(
+            "SELECT input_json FROM cases WHERE id = ?", (case_id,)
+        ).fetchone()
+    return json_loads(row[0]) if row else None
+
+
+def count_cases() -> int:
+    with read_ctx() as conn:
+        return conn.execute("SELECT COUNT(*) FROM cases").fetchone()[0]
+
+
+def next_case_id() -> int:
+    """
+    Id the next case will get – an O(1) lookup instead of materialising
+    every row just to count them.
+
+    ``cases.id`` is AUTOINCREMENT, so ids of deleted rows are never reused;
+    the high-water mark lives in ``sqlite_sequence``, not in ``MAX(id)``.
+    """
+    with read_ctx() as conn:
+        row = conn.execute(
+            """
+            SELECT COALESCE(
+                (SELECT seq FROM sqlite_sequence WHERE name = 'cases'),
+                (SELECT MAX(id) FROM cases),
+                0
+            ) + 1
+            """
+        ).fetchone()
+    return row[0]
 
 
 def delete_case(case_id: int, docx_path: str | None = None, rtf_path: str | None = None):
     """
     Delete one generated‐document record and optionally its files.
     """
-    conn = get_conn()
-    conn.execute("DELETE FROM cases WHERE id = ?", (case_id,))
-    conn.commit()
-    conn.close()
+    with conn_ctx() as conn:
+        conn.execute("DELETE FROM cases WHERE id = ?", (case_id,))
 
     # remove the files from disk (comment these lines if you want to keep them)
     for p in (docx_path, rtf_path):
         if p and Path(p).exists():
             Path(p).unlink(missing_ok=True)
 
+
+def delete_cases_bulk(case_ids: list[int]) -> None:
+    """
+    Delete several generated-document records in one transaction, then
+    remove their files.
+    """
+    if not case_ids:
+        return
+    marks = ",".join("?" * len(case_ids))
+    with conn_ctx() as conn:
+        rows = conn.execute(
+            f"SELECT docx_path, rtf_path FROM cases WHERE id IN ({marks})",
+            case_ids,
+        ).fetchall()
+        conn.execute(f"DELETE FROM cases WHERE id IN ({marks})", case_ids)
+
+    for row in rows:
+        for p in row:
+            if p and Path(p).exists():
+                Path(p).unlink(missing_ok=True)
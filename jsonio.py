@@ -0,0 +1,34 @@
+# jsonio.py
+"""
+JSON encode/decode shared by app.py and db.py
+---------------------------------------------
+Uses orjson (C, 2-3× faster) when it is installed and falls back to the
+standard json module otherwise, so neither caller repeats the check.
+"""
+from __future__ import annotations
+
+import json
+from typing import Any
+
+try:                                   # optional C JSON codec
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def json_dumps(obj: Any) -> str:
+    """Compact JSON text; anything non-native (e.g. date widgets) → str."""
+    if orjson:
+        return orjson.dumps(obj, default=str).decode()
+    return json.dumps(obj, default=str)
+
+
+def json_pretty(obj: Any) -> str:
+    """Indented JSON for the manifest editor."""
+    if orjson:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(obj, indent=2)
+
+
+def json_loads(raw: str | bytes) -> Any:
+    return orjson.loads(raw) if orjson else json.loads(raw)
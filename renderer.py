@@ -8,44 +8,51 @@ Render a DOCX template with docxtpl, then convert it to RTF.
 
 from __future__ import annotations
 
+import io
+import itertools
+import os
 import subprocess
 import shutil
-import uuid
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 from typing import Tuple
 
 from docxtpl import DocxTemplate
 import pypandoc
 import logging
-import re
 
 OUTPUT_DIR = Path("outputs")
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
-HAVE_SOFFICE = shutil.which("soffice") is not None
+# converter binaries, resolved once (shutil.which walks $PATH per call)
+_PANDOC  = shutil.which("pandoc")
+_SOFFICE = shutil.which("soffice")
+HAVE_SOFFICE = _SOFFICE is not None
+
+# Conversion pool. Conversions are subprocess-bound (the GIL is released
+# while waiting on pandoc), so threads overlap them fine.
+_WORKERS = os.cpu_count() or 2
+_CONVERT_POOL = ThreadPoolExecutor(_WORKERS, thread_name_prefix="lexprep-pandoc")
 
-# ── helper: quick visible-text length for an RTF file ────────────────────────
-_RTF_CTRL_RE = re.compile(r"{\\.*?}|\\[A-Za-z]+\d* ?")   # rudimentary strip
 
-def _plain_text_len(rtf_path: Path) -> int:
-    """
-    Approximate the number of visible characters in an RTF file.
-    Used to sanity-check Pandoc output.
-    """
-    try:
-        raw = rtf_path.read_text(errors="ignore")
-        visible = _RTF_CTRL_RE.sub("", raw)
-        return len(visible.strip())
-    except Exception:
-        return 0
-        
-        
-        
 # ── NEW helper: DOCX → RTF via Pandoc ─────────────────────────────────────────
 def _convert_with_pandoc(docx: Path, rtf: Path) -> None:
-    if shutil.which("pandoc") is None:
+    """Run pandoc directly and take the RTF from its stdout, so the result
+    is in memory before it's written (no write-then-read-back)."""
+    if _PANDOC is None:
         raise FileNotFoundError("pandoc not on PATH")
-    pypandoc.convert_file(str(docx), "rtf", outputfile=str(rtf))
+    proc = subprocess.run(
+        [_PANDOC, "--from=docx", "--to=rtf", str(docx)],
+        capture_output=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(
+            f"pandoc exited {proc.returncode}: "
+            f"{proc.stderr.decode(errors='replace').strip()}"
+        )
+    rtf.write_bytes(proc.stdout)
     
 
 # ── NEW helper: DOCX → RTF via Pandoc ─────────────────────────────────────────
@@ -59,18 +66,20 @@ def _convert_to_rtf(docx_in: Path, out_dir: Path) -> Path:
     return rtf_out
 
 
-def _convert_with_soffice(docx: Path, rtf_dir: Path) -> None:
-    if shutil.which("soffice") is None:
+def _convert_with_soffice(docxs: list[Path], rtf_dir: Path) -> None:
+    """Convert every file in *docxs* with a single soffice run – its
+    start-up (libraries, profile, fonts) costs far more than a document."""
+    if _SOFFICE is None:
         raise FileNotFoundError("LibreOffice soffice not on PATH")
     subprocess.run(
         [
-            "soffice",
+            _SOFFICE,
             "--headless",
             "--convert-to",
             "rtf:Rich Text Format",
             "--outdir",
             str(rtf_dir),
-            str(docx),
+            *map(str, docxs),
         ],
         check=True,
         stdout=subprocess.DEVNULL,
@@ -78,38 +87,124 @@ def _convert_with_soffice(docx: Path, rtf_dir: Path) -> None:
     )
 
 
-def render_docx_rtf(
+@lru_cache(maxsize=32)
+def _template_bytes(path: str, mtime_ns: int) -> bytes:
+    """Raw template file, read once per (path, mtime). Each render parses
+    its own DocxTemplate from these bytes – rendering mutates the tree, so
+    a parsed template can't be shared."""
+    return Path(path).read_bytes()
+
+
+def render_docx(
     template_docx_path: str | Path,
     context: dict,
-    base_name: str | None = None,
-) -> Tuple[str, str]:
-    stem = base_name or str(uuid.uuid4())
+    stem: str,
+) -> Path:
+    """Fill *template_docx_path* with *context* and save ``<stem>.docx``."""
     docx_out = OUTPUT_DIR / f"{stem}.docx"
-    rtf_out  = OUTPUT_DIR / f"{stem}.rtf"
-
-    # ── Fill DOCX ───────────────────────────────────────────────────────────
-    tpl = DocxTemplate(str(template_docx_path))
+    path = str(template_docx_path)
+    tpl = DocxTemplate(io.BytesIO(_template_bytes(path, os.stat(path).st_mtime_ns)))
     tpl.render(context)
     tpl.save(docx_out)
+    return docx_out
 
-    # ── DOCX ➜ RTF  (fast path: Pandoc) ─────────────────────────────────────
-    try:
-        _convert_with_pandoc(docx_out, rtf_out)
 
-        # sanity-check: if visible text < 100 chars, maybe Pandoc mis-fired
-        #if _plain_text_len(rtf_out) < 100:
-        #    rtf_out.unlink(missing_ok=True)
-        #    raise RuntimeError("Pandoc produced incomplete RTF")
+def convert_to_rtf(docx_out: Path) -> Path:
+    """
+    DOCX ➜ RTF next to *docx_out*: Pandoc first, LibreOffice as fallback.
+    """
+    return convert_many_to_rtf([docx_out])[0]
 
-    except Exception as err:
-        logging.warning("Pandoc path failed: %s", err)
 
+def convert_many_to_rtf(docx_outs: list[Path]) -> list[Path]:
+    """
+    DOCX ➜ RTF next to each file. Pandoc converts file by file; whatever
+    it fails on is handed to LibreOffice together, one soffice run per
+    output directory.
+    """
+    rtf_outs = [d.with_suffix(".rtf") for d in docx_outs]
+    failed: dict[Path, list[Path]] = {}          # out dir → DOCX files
+    first_err: Exception | None = None
+
+    # ── fast path: Pandoc (one child per file, run concurrently) ───────────
+    if len(docx_outs) > 1:
+        jobs = [
+            _CONVERT_POOL.submit(_convert_with_pandoc, docx_out, rtf_out)
+            for docx_out, rtf_out in zip(docx_outs, rtf_outs)
+        ]
+    else:                                        # single file: no thread hop
+        jobs = [None] * len(docx_outs)
+
+    for docx_out, rtf_out, job in zip(docx_outs, rtf_outs, jobs):
+        try:
+            if job is None:
+                _convert_with_pandoc(docx_out, rtf_out)
+            else:
+                job.result()
+        except Exception as err:
+            logging.warning("Pandoc path failed for %s: %s", docx_out.name, err)
+            failed.setdefault(rtf_out.parent, []).append(docx_out)
+            first_err = first_err or err
+
+    if failed:
         if HAVE_SOFFICE:
             logging.info("Falling back to LibreOffice (‘soffice’) conversion…")
-            _convert_with_soffice(docx_out, rtf_out.parent)
+            for rtf_dir, docxs in failed.items():
+                _convert_with_soffice(docxs, rtf_dir)
         else:
             # Nothing else we can do on Streamlit Cloud → re-raise to surface error
             logging.error("LibreOffice not available – cannot convert DOCX ➜ RTF")
-            raise
-    
-    return str(docx_out), str(rtf_out)
+            raise first_err
+
+    return rtf_outs
+
+
+# default output stems: start time + pid + per-process counter – unique
+# within outputs/ (pids repeat across container restarts, hence the start
+# time) without a /dev/urandom read per render as uuid4 does
+_STEM_PREFIX = f"{int(time.time()):x}-{os.getpid()}"
+_STEM = itertools.count()
+
+
+def _default_stem() -> str:
+    return f"{_STEM_PREFIX}-{next(_STEM):06x}"
+
+
+def render_many(
+    template_docx_path: str | Path,
+    contexts: list[dict],
+    base_names: list[str | None] | None = None,
+) -> list[Tuple[str, str]]:
+    """
+    Render one template for several contexts: every DOCX is filled first,
+    then all RTF conversions run as one batch. Returns ``(docx, rtf)``
+    path pairs in the order of *contexts*.
+    """
+    if base_names is None:
+        base_names = [None] * len(contexts)
+    elif len(base_names) != len(contexts):
+        raise ValueError(
+            f"{len(base_names)} base names for {len(contexts)} contexts"
+        )
+    stems = [name or _default_stem() for name in base_names]
+    # two renders into one stem would overwrite each other's DOCX and then
+    # convert the same file concurrently into the same RTF
+    if len(set(stems)) != len(stems):
+        raise ValueError("base names must be unique within a batch")
+    docx_outs = [
+        render_docx(template_docx_path, ctx, stem)
+        for ctx, stem in zip(contexts, stems)
+    ]
+    rtf_outs = convert_many_to_rtf(docx_outs)
+    return [(str(d), str(r)) for d, r in zip(docx_outs, rtf_outs)]
+
+
+def render_docx_rtf(
+    template_docx_path: str | Path,
+    context: dict,
+    base_name: str | None = None,
+) -> Tuple[str, str]:
+    # single-case shim over the batch path (RTF is converted *from* the
+    # filled DOCX, so the two steps are serial per case)
+    return render_many(template_docx_path, [context], [base_name])[0]
+
@@ -4,7 +4,7 @@ LexPrep utilities
 -----------------
 Currently provides one helper:
 
-    extract_placeholders(docx_path)  →  list[str]
+    extract_placeholders(docx)  →  list[str]
 
 It scans a Word document for double-brace placeholders such as:
 
@@ -19,58 +19,81 @@ Placeholders with the pattern  `root[].subkey`  are intended to signal
 “repeat” groups (tables or lists) when the manifest is auto-built in
 app.py, but this module itself just reports the strings it finds.
 
-Requires `python-docx`:
-    pip install python-docx
+The scan reads the .docx zip directly (body, headers and footers) with
+the standard library only – no python-docx object tree is built.
 """
 from __future__ import annotations
 
 import re
+import zipfile
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Set
+from typing import IO, List, Set
 
-from docx import Document  # python-docx
 
+# Bump whenever the scan's output can change (patterns, parts scanned, …):
+# app.py puts it in the key of its disk-persisted placeholder cache.
+SCAN_VERSION = 1
 
 # Matches {{ some_key }}  where the key may contain letters, numbers,
 # underscores, dots, and square brackets (for repeat groups).
-_FIELD_RE = re.compile(r"{{\s*([a-zA-Z0-9_.\[\]]+)\s*}}")
+# A bytes pattern, run straight on the part's UTF-8 XML (no decode; byte
+# classes are ASCII-only, like re.ASCII). Word likes to put a no-break
+# space (UTF-8 C2 A0) inside the braces, so that counts as padding too.
+_PAD = rb"(?:\s|\xc2\xa0)*"
+_FIELD_RE = re.compile(rb"{{" + _PAD + rb"([a-zA-Z0-9_.\[\]]+)" + _PAD + rb"}}")
 
+# XML parts that can hold placeholders: body, headers, footers
+_PART_RE = re.compile(r"word/(?:document|header\d*|footer\d*)\.xml")
+# any tag; Word splits one visible string over several runs, so tags are
+# removed outright (not replaced by spaces) to re-join "{{ na" + "me }}"
+_TAG_RE = re.compile(rb"<[^>]+>")
 
-def extract_placeholders(docx_path: Path | str) -> List[str]:
+
+def extract_placeholders(docx: Path | str | IO[bytes]) -> List[str]:
     """
-    Scan the DOCX at *docx_path* and return a sorted list of unique
-    placeholder keys found anywhere in the document (paragraphs and tables).
+    Scan the DOCX *docx* and return a sorted list of unique
+    placeholder keys found anywhere in the document (paragraphs, tables,
+    headers and footers).
 
     Parameters
     ----------
-    docx_path : pathlib.Path | str
-        Path to the .docx file to inspect.
+    docx : pathlib.Path | str | binary file-like
+        Path to the .docx file to inspect, or an open binary stream
+        (e.g. ``io.BytesIO`` / a Streamlit ``UploadedFile``) – read in
+        place, no temp file needed.
 
     Returns
     -------
     List[str]
         Sorted list of unique placeholder keys.
     """
-    docx_path = Path(docx_path)
-    if not docx_path.exists():
-        raise FileNotFoundError(docx_path)
-
-    document = Document(docx_path)
-    keys: Set[str] = set()
-
-    def _collect(text: str) -> None:
-        if not text:
-            return
-        keys.update(_FIELD_RE.findall(text))
-
-    # scan paragraphs
-    for para in document.paragraphs:
-        _collect(para.text)
-
-    # scan every cell in every table
-    for table in document.tables:
-        for row in table.rows:
-            for cell in row.cells:
-                _collect(cell.text)
-
-    return sorted(keys)
+    if isinstance(docx, (str, Path)):
+        docx = Path(docx)
+        if not docx.exists():
+            raise FileNotFoundError(docx)
+        st = docx.stat()
+        return list(_scan_file(str(docx), st.st_mtime_ns, st.st_size))
+
+    return _scan(docx)
+
+
+@lru_cache(maxsize=256)
+def _scan_file(path: str, mtime_ns: int, size: int) -> tuple[str, ...]:
+    """Scan of a file on disk, memoised until the file changes
+    (mtime/size are part of the key)."""
+    return tuple(_scan(path))
+
+
+def _scan(docx: str | IO[bytes]) -> List[str]:
+    with zipfile.ZipFile(docx) as z:
+        # body + headers + footers in one buffer; paragraph and part
+        # boundaries become NUL, so a match can't span two of them
+        xml = b"\0".join(
+            z.read(name) for name in z.namelist() if _PART_RE.fullmatch(name)
+        ).replace(b"</w:p>", b"\0")
+
+    # one tag strip and one findall for the whole document
+    keys: Set[bytes] = set(_FIELD_RE.findall(_TAG_RE.sub(b"", xml)))
+    # keys are ASCII by construction, so byte order == str order
+    return [k.decode("ascii") for k in sorted(keys)]